@@ -39,7 +39,9 @@ go mod download
 # Компилируем приложение
 echo "Компилирую приложение..."
 cd cmd/gui
-go build -o FolderToGit
+# Без таблицы символов и отладочной информации бинарный файл заметно меньше
+# и быстрее загружается при запуске
+go build -trimpath -ldflags="-s -w" -o FolderToGit
 
 # Создаем .app пакет
 echo "Создаю .app пакет..."
@@ -1,8 +1,15 @@
 package main
 
 import (
+	"errors"
 	"fmt"
 	"image/color"
+	"io"
+	"log"
+	"os"
+	"strings"
+	"sync"
+	"time"
 
 	"fyne.io/fyne/v2"
 	"fyne.io/fyne/v2/app"
@@ -29,10 +36,19 @@ type GUI struct {
 	dryRunCheck   *widget.Check
 	verboseCheck  *widget.Check
 	appendCheck   *widget.Check
+	fastCheck     *widget.Check
+	linksCheck    *widget.Check
 	logText       *widget.Entry
 	convertButton *widget.Button
+
+	// Строки лога, ожидающие вывода в окно
+	logMu      sync.Mutex
+	logPending strings.Builder
 }
 
+// logFlushInterval — как часто накопленные строки лога выводятся в окно
+const logFlushInterval = 50 * time.Millisecond
+
 func main() {
 	a := app.NewWithID("com.foldertogit.app")
 	a.Settings().SetTheme(newNativeTheme())
@@ -49,6 +65,13 @@ func main() {
 	}
 
 	gui.setupUI()
+
+	// Сообщения конвертера дублируются в лог окна. Лог окна идет первым,
+	// а ошибки записи в stderr игнорируются: у сборки для Windows с
+	// -H windowsgui нет консоли, и каждая запись в stderr завершается ошибкой
+	log.SetOutput(io.MultiWriter(logWriter{gui}, stderrWriter{}))
+	go gui.runLogFlusher()
+
 	window.Resize(fyne.NewSize(700, 750))
 	window.ShowAndRun()
 }
@@ -57,36 +80,30 @@ func (g *GUI) setupUI() {
 	// Создаем элементы ввода с нативным стилем
 	g.sourceEntry = widget.NewEntry()
 	g.sourceEntry.SetPlaceHolder("./versions или /путь/к/папкам/с/версиями")
-	g.sourceEntry.Resize(fyne.NewSize(300, g.sourceEntry.MinSize().Height))
 	styleNativeEntry(g.sourceEntry)
 
 	g.targetEntry = widget.NewEntry()
 	g.targetEntry.SetPlaceHolder("./git_repo или /путь/к/репозиторию")
-	g.targetEntry.Resize(fyne.NewSize(300, g.targetEntry.MinSize().Height))
 	styleNativeEntry(g.targetEntry)
 
 	g.patternEntry = widget.NewEntry()
 	g.patternEntry.SetText(g.config.Pattern)
 	g.patternEntry.SetPlaceHolder("version_* или project_v*")
-	g.patternEntry.Resize(fyne.NewSize(300, g.patternEntry.MinSize().Height))
 	styleNativeEntry(g.patternEntry)
 
 	g.extractEntry = widget.NewEntry()
 	g.extractEntry.SetText(g.config.ExtractPattern)
 	g.extractEntry.SetPlaceHolder("[0-9]+ или v([0-9]+)")
-	g.extractEntry.Resize(fyne.NewSize(300, g.extractEntry.MinSize().Height))
 	styleNativeEntry(g.extractEntry)
 
 	g.authorEntry = widget.NewEntry()
 	g.authorEntry.SetText(g.config.Author)
 	g.authorEntry.SetPlaceHolder("Иван Иванов")
-	g.authorEntry.Resize(fyne.NewSize(300, g.authorEntry.MinSize().Height))
 	styleNativeEntry(g.authorEntry)
 
 	g.emailEntry = widget.NewEntry()
 	g.emailEntry.SetText(g.config.Email)
 	g.emailEntry.SetPlaceHolder("ivan@example.com")
-	g.emailEntry.Resize(fyne.NewSize(300, g.emailEntry.MinSize().Height))
 	styleNativeEntry(g.emailEntry)
 
 	// Кнопки выбора директорий с нативным стилем
@@ -116,6 +133,8 @@ func (g *GUI) setupUI() {
 	g.dryRunCheck = widget.NewCheck("Тестовый режим", nil)
 	g.verboseCheck = widget.NewCheck("Подробный вывод", nil)
 	g.appendCheck = widget.NewCheck("Добавить к существующему", nil)
+	g.fastCheck = widget.NewCheck("Быстрый импорт", nil)
+	g.linksCheck = widget.NewCheck("Жесткие ссылки", nil)
 
 	// Лог
 	g.logText = widget.NewEntry()
@@ -145,6 +164,8 @@ func (g *GUI) setupUI() {
 		g.dryRunCheck,
 		g.verboseCheck,
 		g.appendCheck,
+		g.fastCheck,
+		g.linksCheck,
 	)
 
 	buttons := container.NewHBox(
@@ -262,19 +283,23 @@ func (t *nativeTheme) Size(s fyne.ThemeSizeName) float32 {
 }
 
 func (g *GUI) startConversion() {
+	// Читаем поля один раз: и для проверки, и для конфигурации
+	sourceDir := g.sourceEntry.Text
+	targetDir := g.targetEntry.Text
+
 	// Проверяем входные данные
-	if g.sourceEntry.Text == "" {
-		dialog.ShowError(fmt.Errorf("укажите исходную директорию"), g.window)
+	if sourceDir == "" {
+		dialog.ShowError(errors.New("укажите исходную директорию"), g.window)
 		return
 	}
-	if g.targetEntry.Text == "" {
-		dialog.ShowError(fmt.Errorf("укажите целевую директорию"), g.window)
+	if targetDir == "" {
+		dialog.ShowError(errors.New("укажите целевую директорию"), g.window)
 		return
 	}
 
 	// Обновляем конфигурацию
-	g.config.SourceDir = g.sourceEntry.Text
-	g.config.TargetDir = g.targetEntry.Text
+	g.config.SourceDir = sourceDir
+	g.config.TargetDir = targetDir
 	g.config.Pattern = g.patternEntry.Text
 	g.config.ExtractPattern = g.extractEntry.Text
 	g.config.Author = g.authorEntry.Text
@@ -282,6 +307,8 @@ func (g *GUI) startConversion() {
 	g.config.DryRun = g.dryRunCheck.Checked
 	g.config.Verbose = g.verboseCheck.Checked
 	g.config.Append = g.appendCheck.Checked
+	g.config.FastImport = g.fastCheck.Checked
+	g.config.HardLinks = g.linksCheck.Checked
 
 	// Отключаем кнопку на время конвертации
 	g.convertButton.Disable()
@@ -307,8 +334,6 @@ func (g *GUI) startConversion() {
 			return
 		}
 
-		g.log(fmt.Sprintf("Найдено %d папок с версиями", len(folders)))
-
 		// Выполняем миграцию
 		if err := gitconverter.MigrateToGit(g.config, folders); err != nil {
 			g.logError("Ошибка миграции:", err)
@@ -323,15 +348,60 @@ func (g *GUI) startConversion() {
 	}()
 }
 
+// log добавляет строку в лог. Строки накапливаются и выводятся в окно пачкой
+// раз в logFlushInterval, чтобы тысячи сообщений не вызывали тысячи перерисовок
 func (g *GUI) log(msg string) {
-	g.logText.SetText(g.logText.Text + "\n" + msg)
+	g.logMu.Lock()
+	g.logPending.WriteString("\n")
+	g.logPending.WriteString(msg)
+	g.logMu.Unlock()
+}
+
+// flushLog дописывает накопленные строки в конец лога одним обновлением виджета.
+// Append не пересобирает весь накопленный текст, как SetText(Text + ...)
+func (g *GUI) flushLog() {
+	g.logMu.Lock()
+	text := g.logPending.String()
+	g.logPending.Reset()
+	g.logMu.Unlock()
+
+	if text != "" {
+		g.logText.Append(text)
+	}
+}
+
+// runLogFlusher периодически выводит накопленные строки лога
+func (g *GUI) runLogFlusher() {
+	ticker := time.NewTicker(logFlushInterval)
+	defer ticker.Stop()
+	for range ticker.C {
+		g.flushLog()
+	}
+}
+
+// logWriter передает вывод стандартного логгера в лог окна
+type logWriter struct {
+	g *GUI
+}
+
+func (w logWriter) Write(p []byte) (int, error) {
+	w.g.log(strings.TrimSuffix(string(p), "\n"))
+	return len(p), nil
+}
+
+// stderrWriter пишет в stderr, не сообщая об ошибках записи
+type stderrWriter struct{}
+
+func (stderrWriter) Write(p []byte) (int, error) {
+	os.Stderr.Write(p)
+	return len(p), nil
 }
 
 func (g *GUI) logError(msg string, err error) {
 	if err != nil {
 		msg = fmt.Sprintf("%s %v", msg, err)
 	}
-	dialog.ShowError(fmt.Errorf(msg), g.window)
+	dialog.ShowError(errors.New(msg), g.window)
 	g.log("ОШИБКА: " + msg)
 }
 
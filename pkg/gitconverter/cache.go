@@ -0,0 +1,184 @@
+package gitconverter
+
+import (
+	"encoding/json"
+	"os"
+	"path/filepath"
+	"sync"
+
+	"github.com/go-git/go-git/v5/plumbing"
+)
+
+// cachedCreationTime — сохраненный результат анализа папки с версией
+type cachedCreationTime struct {
+	DirModTime int64 `json:"dir_mtime"` // Время изменения самой папки (UnixNano)
+	Time       int64 `json:"time"`      // Рассчитанное время создания (Unix)
+}
+
+// creationTimeCache хранит рассчитанное время создания папок между запусками.
+// Запись действительна, пока не изменилось время модификации самой папки,
+// поэтому повторный запуск не обходит файлы неизмененных версий.
+// get и put безопасны для одновременного вызова из нескольких горутин
+type creationTimeCache struct {
+	mu      sync.Mutex
+	path    string
+	entries map[string]cachedCreationTime
+	dirty   bool
+}
+
+// creationTimeCachePath — путь к файлу кэша в пользовательской директории кэша.
+// Он не меняется за время работы программы, поэтому переменные окружения
+// читаются один раз, а не при каждом поиске папок. Пустая строка означает,
+// что директорию кэша определить не удалось
+var creationTimeCachePath = sync.OnceValue(func() string {
+	dir, err := os.UserCacheDir()
+	if err != nil {
+		return ""
+	}
+	return filepath.Join(dir, "foldertogit", "creation_times.json")
+})
+
+// loadCreationTimeCache загружает кэш из пользовательской директории кэша
+func loadCreationTimeCache() *creationTimeCache {
+	cache := &creationTimeCache{entries: make(map[string]cachedCreationTime)}
+
+	cache.path = creationTimeCachePath()
+	if cache.path == "" {
+		return cache
+	}
+
+	data, err := os.ReadFile(cache.path)
+	if err != nil {
+		return cache
+	}
+	if err := json.Unmarshal(data, &cache.entries); err != nil {
+		cache.entries = make(map[string]cachedCreationTime)
+	}
+	return cache
+}
+
+// get возвращает сохраненное время создания папки, если она не менялась
+func (c *creationTimeCache) get(path string, dirModTime int64) (int64, bool) {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+
+	entry, ok := c.entries[path]
+	if !ok || entry.DirModTime != dirModTime {
+		return 0, false
+	}
+	return entry.Time, true
+}
+
+// put запоминает рассчитанное время создания папки
+func (c *creationTimeCache) put(path string, dirModTime, creationTime int64) {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+
+	c.entries[path] = cachedCreationTime{DirModTime: dirModTime, Time: creationTime}
+	c.dirty = true
+}
+
+// save атомарно записывает кэш на диск (через временный файл и переименование)
+func (c *creationTimeCache) save() error {
+	if c.path == "" || !c.dirty {
+		return nil
+	}
+
+	if err := os.MkdirAll(filepath.Dir(c.path), 0755); err != nil {
+		return err
+	}
+
+	if err := writeJSONAtomic(c.path, c.entries); err != nil {
+		return err
+	}
+
+	c.dirty = false
+	return nil
+}
+
+// treeCacheFile — файл кэша деревьев версий внутри директории .git
+const treeCacheFile = "foldertogit-trees.json"
+
+// treeCache сопоставляет отпечаток папки с версией (см. folderFingerprint) хешу
+// дерева, записанного для нее быстрым импортом. Кэш хранится в .git целевого
+// репозитория, поэтому повторный импорт тех же папок не читает их файлы заново
+type treeCache struct {
+	path    string
+	entries map[string]string // отпечаток -> хеш дерева в шестнадцатеричном виде
+	dirty   bool
+}
+
+// loadTreeCache загружает кэш деревьев
+func loadTreeCache(path string) *treeCache {
+	cache := &treeCache{path: path, entries: make(map[string]string)}
+
+	data, err := os.ReadFile(path)
+	if err != nil {
+		return cache
+	}
+	if err := json.Unmarshal(data, &cache.entries); err != nil {
+		cache.entries = make(map[string]string)
+	}
+	return cache
+}
+
+// get возвращает сохраненный хеш дерева для отпечатка папки
+func (c *treeCache) get(fingerprint string) (plumbing.Hash, bool) {
+	if fingerprint == "" {
+		return plumbing.ZeroHash, false
+	}
+	hash, ok := c.entries[fingerprint]
+	if !ok {
+		return plumbing.ZeroHash, false
+	}
+	return plumbing.NewHash(hash), true
+}
+
+// put запоминает хеш дерева для отпечатка папки
+func (c *treeCache) put(fingerprint string, hash plumbing.Hash) {
+	if fingerprint == "" {
+		return
+	}
+	c.entries[fingerprint] = hash.String()
+	c.dirty = true
+}
+
+// save атомарно записывает кэш на диск
+func (c *treeCache) save() error {
+	if !c.dirty {
+		return nil
+	}
+	if err := writeJSONAtomic(c.path, c.entries); err != nil {
+		return err
+	}
+	c.dirty = false
+	return nil
+}
+
+// writeJSONAtomic записывает v в формате JSON через временный файл и переименование,
+// чтобы прерванная запись не оставила поврежденный файл
+func writeJSONAtomic(path string, v interface{}) error {
+	data, err := json.Marshal(v)
+	if err != nil {
+		return err
+	}
+
+	tmp, err := os.CreateTemp(filepath.Dir(path), filepath.Base(path)+"-*.tmp")
+	if err != nil {
+		return err
+	}
+	if _, err := tmp.Write(data); err != nil {
+		tmp.Close()
+		os.Remove(tmp.Name())
+		return err
+	}
+	if err := tmp.Close(); err != nil {
+		os.Remove(tmp.Name())
+		return err
+	}
+	if err := os.Rename(tmp.Name(), path); err != nil {
+		os.Remove(tmp.Name())
+		return err
+	}
+	return nil
+}
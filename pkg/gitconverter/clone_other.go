@@ -0,0 +1,10 @@
+//go:build !linux
+
+package gitconverter
+
+import "os"
+
+// cloneFile на остальных платформах не поддерживается, используется обычное копирование
+func cloneFile(dst, src *os.File) bool {
+	return false
+}
@@ -1,19 +1,32 @@
 package gitconverter
 
 import (
+	"bytes"
+	"cmp"
+	"errors"
 	"fmt"
 	"io"
+	"io/fs"
 	"log"
 	"os"
 	"path/filepath"
 	"regexp"
-	"sort"
+	"runtime"
+	"slices"
+	"strconv"
 	"strings"
+	"sync"
+	"sync/atomic"
 	"time"
 
+	"github.com/go-git/go-billy/v5/osfs"
 	"github.com/go-git/go-git/v5"
 	"github.com/go-git/go-git/v5/plumbing"
+	"github.com/go-git/go-git/v5/plumbing/cache"
+	"github.com/go-git/go-git/v5/plumbing/filemode"
+	"github.com/go-git/go-git/v5/plumbing/format/index"
 	"github.com/go-git/go-git/v5/plumbing/object"
+	"github.com/go-git/go-git/v5/storage/filesystem"
 )
 
 // FolderInfo содержит информацию о папке с версией
@@ -36,14 +49,28 @@ type Config struct {
 	Append          bool
 	AuthorsFile     string // Файл с сопоставлением версий и авторов
 	MessageTemplate string // Шаблон сообщения коммита
+	FastImport      bool   // Записывать версии сразу в базу объектов Git, минуя рабочую директорию
+	HardLinks       bool   // Создавать в рабочей директории жесткие ссылки на исходные файлы вместо копий
 }
 
+// versionMessageRe извлекает версию из стандартного сообщения коммита "Version <версия>: ..."
+var versionMessageRe = regexp.MustCompile(`^Version\s+([^:]+):`)
+
+// timeLayout — формат времени создания версии в логах и сообщениях коммитов
+const timeLayout = "2006-01-02 15:04:05"
+
+// formatCreationTime форматирует время создания версии (Unix timestamp) по timeLayout
+func formatCreationTime(unix int64) string {
+	return time.Unix(unix, 0).Format(timeLayout)
+}
+
+// scanWorkers — число папок, анализируемых одновременно
+const scanWorkers = 4
+
 // FindVersionedFolders ищет папки с версиями проекта
 func FindVersionedFolders(config Config) ([]FolderInfo, error) {
 	var folders []FolderInfo
-
-	// Создаем полный путь для поиска
-	searchPattern := filepath.Join(config.SourceDir, config.Pattern)
+	var folderInfos []os.FileInfo
 
 	// Компилируем регулярное выражение для извлечения версии
 	re, err := regexp.Compile(config.ExtractPattern)
@@ -51,22 +78,23 @@ func FindVersionedFolders(config Config) ([]FolderInfo, error) {
 		return nil, fmt.Errorf("ошибка в регулярном выражении: %v", err)
 	}
 
+	// Абсолютный путь исходной директории получаем один раз: пути найденных
+	// папок тогда тоже абсолютные, и filepath.Abs для ключа кэша в
+	// folderCreationTime не запрашивает текущую директорию для каждой папки
+	sourceDir := config.SourceDir
+	if abs, err := filepath.Abs(sourceDir); err == nil {
+		sourceDir = abs
+	}
+
 	// Ищем папки, соответствующие шаблону
-	matches, err := filepath.Glob(searchPattern)
+	matches, err := findMatchingDirs(sourceDir, config.Pattern)
 	if err != nil {
 		return nil, fmt.Errorf("ошибка при поиске папок: %v", err)
 	}
 
 	// Обрабатываем каждую найденную папку
-	for _, path := range matches {
-		// Проверяем, что это директория
-		info, err := os.Stat(path)
-		if err != nil || !info.IsDir() {
-			continue
-		}
-
-		// Получаем имя папки
-		name := filepath.Base(path)
+	for _, match := range matches {
+		path, name := match.path, match.name
 
 		// Извлекаем версию из имени папки
 		version := ""
@@ -79,28 +107,59 @@ func FindVersionedFolders(config Config) ([]FolderInfo, error) {
 			continue
 		}
 
-		// Получаем время создания папки
-		creationTime := getFolderCreationTime(path)
+		// Время изменения нужно только папкам с версией: по нему проверяется кэш
+		info, err := match.stat()
+		if err != nil {
+			continue
+		}
 
 		folders = append(folders, FolderInfo{
-			Path:         path,
-			Version:      version,
-			CreationTime: creationTime,
+			Path:    path,
+			Version: version,
 		})
+		folderInfos = append(folderInfos, info)
+	}
 
-		if config.Verbose {
-			log.Printf("Найдена папка: %s (версия: %s, создана: %s)",
-				name, version, time.Unix(creationTime, 0).Format("2006-01-02 15:04:05"))
-		}
+	// Без папок с версиями не нужны ни кэш, ни анализ файлов
+	if len(folders) == 0 {
+		return nil, fmt.Errorf("не найдены папки с версиями в %s", config.SourceDir)
 	}
 
-	// Сортируем папки по времени создания
-	sort.Slice(folders, func(i, j int) bool {
-		return folders[i].CreationTime < folders[j].CreationTime
+	// Загружаем результаты анализа папок из предыдущих запусков
+	timeCache := loadCreationTimeCache()
+
+	// Получаем время создания папок параллельно: папки независимы, а обход
+	// упирается в метаданные ФС. Больше scanWorkers потоков на одном томе
+	// обычно не помогают из-за блокировок директорий в ядре
+	var wg sync.WaitGroup
+	sem := make(chan struct{}, scanWorkers)
+	for i := range folders {
+		wg.Add(1)
+		sem <- struct{}{}
+		go func(folder *FolderInfo, info os.FileInfo) {
+			defer wg.Done()
+			folder.CreationTime = folderCreationTime(timeCache, folder.Path, info)
+			<-sem
+		}(&folders[i], folderInfos[i])
+	}
+	wg.Wait()
+
+	if err := timeCache.save(); err != nil {
+		log.Printf("Предупреждение: не удалось сохранить кэш времени создания папок: %v", err)
+	}
+
+	// Сортируем папки по времени создания. Обобщенная сортировка сравнивает
+	// значения напрямую, без рефлексии sort.Slice; стабильная сохраняет порядок
+	// имен для папок с одинаковым временем
+	slices.SortStableFunc(folders, func(a, b FolderInfo) int {
+		return cmp.Compare(a.CreationTime, b.CreationTime)
 	})
 
-	if len(folders) == 0 {
-		return nil, fmt.Errorf("не найдены папки с версиями в %s", config.SourceDir)
+	// Список папок выводится только в подробном режиме: при тысячах версий
+	// форматирование и вывод каждой строки заметно замедляют поиск
+	if !config.Verbose {
+		log.Printf("Найдено %d папок с версиями", len(folders))
+		return folders, nil
 	}
 
 	log.Printf("Найдено %d папок с версиями:", len(folders))
@@ -109,77 +168,193 @@ func FindVersionedFolders(config Config) ([]FolderInfo, error) {
 			i+1,
 			filepath.Base(folder.Path),
 			folder.Version,
-			time.Unix(folder.CreationTime, 0).Format("2006-01-02 15:04:05"))
+			formatCreationTime(folder.CreationTime))
 	}
 
 	return folders, nil
 }
 
-// MigrateToGit выполняет миграцию папок в Git-репозиторий
-func MigrateToGit(config Config, folders []FolderInfo) error {
-	if config.DryRun {
-		log.Println("Запущен тестовый режим (dry-run), Git-репозиторий не будет создан")
-		return nil
+// matchedDir — директория в исходной папке, имя которой соответствует шаблону
+type matchedDir struct {
+	path  string
+	name  string
+	entry fs.DirEntry // запись директории, если info еще не получена
+	info  os.FileInfo
+}
+
+// stat возвращает информацию о директории, запрашивая ее у записи только при необходимости
+func (m matchedDir) stat() (os.FileInfo, error) {
+	if m.info != nil {
+		return m.info, nil
 	}
+	return m.entry.Info()
+}
 
-	// Создаем директорию для репозитория, если её нет
-	if err := os.MkdirAll(config.TargetDir, 0755); err != nil {
-		return fmt.Errorf("ошибка создания директории: %v", err)
+// findMatchingDirs возвращает директории в sourceDir, имена которых соответствуют шаблону
+func findMatchingDirs(sourceDir, pattern string) ([]matchedDir, error) {
+	var dirs []matchedDir
+
+	if strings.ContainsRune(pattern, filepath.Separator) || strings.ContainsRune(pattern, '/') {
+		paths, err := filepath.Glob(filepath.Join(sourceDir, pattern))
+		if err != nil {
+			return nil, err
+		}
+		for _, path := range paths {
+			info, err := os.Stat(path)
+			if err != nil || !info.IsDir() {
+				continue
+			}
+			dirs = append(dirs, matchedDir{path: path, name: filepath.Base(path), info: info})
+		}
+		return dirs, nil
 	}
 
-	// Проверяем существование репозитория
-	gitDir := filepath.Join(config.TargetDir, ".git")
-	repoExists := false
-	if _, err := os.Stat(gitDir); err == nil {
-		repoExists = true
+	// Проверяем синтаксис шаблона один раз, а не на каждом имени
+	if _, err := filepath.Match(pattern, ""); err != nil {
+		return nil, err
+	}
+
+	// Как и filepath.Glob, ошибки чтения директории не считаем фатальными
+	entries, _ := os.ReadDir(sourceDir)
+	prefix := pathPrefix(filepath.Clean(sourceDir))
+	for _, entry := range entries {
+		name := entry.Name()
+		if matched, _ := filepath.Match(pattern, name); !matched {
+			continue
+		}
+
+		path := prefix + name
+		if entry.Type()&fs.ModeSymlink != 0 {
+			// Ссылка на папку с версией тоже подходит
+			info, err := os.Stat(path)
+			if err != nil || !info.IsDir() {
+				continue
+			}
+			dirs = append(dirs, matchedDir{path: path, name: name, info: info})
+			continue
+		}
+		if !entry.IsDir() {
+			continue
+		}
+
+		dirs = append(dirs, matchedDir{path: path, name: name, entry: entry})
 	}
+	return dirs, nil
+}
 
-	var repo *git.Repository
-	var err error
+// openStorage открывает хранилище объектов в .git репозитория dir с монопольным доступом
+func openStorage(dir string) *filesystem.Storage {
+	dotGit := osfs.New(filepath.Join(dir, git.GitDirName), osfs.WithBoundOS())
+	return filesystem.NewStorageWithOptions(dotGit, cache.NewObjectLRUDefault(), filesystem.Options{
+		ExclusiveAccess: true,
+	})
+}
 
-	// Инициализируем или открываем репозиторий
-	if !repoExists && !config.Append {
-		repo, err = git.PlainInit(config.TargetDir, false)
+// openRepository открывает репозиторий в целевой директории, а если его нет —
+// инициализирует новый (кроме режима добавления)
+func openRepository(config Config) (*git.Repository, error) {
+	// .git может быть файлом со ссылкой на каталог репозитория (gitdir:), как
+	// у связанных рабочих деревьев и подмодулей. Такой репозиторий уже существует,
+	// и его открывает PlainOpen, который умеет читать эту ссылку
+	if info, err := os.Lstat(filepath.Join(config.TargetDir, git.GitDirName)); err == nil && !info.IsDir() {
+		repo, err := git.PlainOpen(config.TargetDir)
 		if err != nil {
-			return fmt.Errorf("ошибка инициализации репозитория: %v", err)
+			return nil, fmt.Errorf("ошибка открытия репозитория: %v", err)
 		}
-		log.Printf("Инициализирован новый репозиторий в %s", config.TargetDir)
-	} else if config.Append && !repoExists {
-		return fmt.Errorf("указан режим --append, но репозиторий не существует в %s", config.TargetDir)
-	} else {
-		repo, err = git.PlainOpen(config.TargetDir)
+		log.Printf("Открыт существующий репозиторий в %s", config.TargetDir)
+		return repo, nil
+	}
+
+	// Открываем существующий репозиторий, а если его нет — инициализируем новый.
+	// На время миграции репозиторий принадлежит конвертеру, поэтому хранилище
+	// открывается с монопольным доступом (см. openStorage)
+	worktreeFS := osfs.New(config.TargetDir, osfs.WithBoundOS())
+	storage := openStorage(config.TargetDir)
+	repo, err := git.Open(storage, worktreeFS)
+	switch {
+	case err == git.ErrRepositoryNotExists:
+		if config.Append {
+			return nil, fmt.Errorf("указан режим --append, но репозиторий не существует в %s", config.TargetDir)
+		}
+		repo, err = git.Init(storage, worktreeFS)
 		if err != nil {
-			return fmt.Errorf("ошибка открытия репозитория: %v", err)
+			return nil, fmt.Errorf("ошибка инициализации репозитория: %v", err)
 		}
+		log.Printf("Инициализирован новый репозиторий в %s", config.TargetDir)
+	case err != nil:
+		return nil, fmt.Errorf("ошибка открытия репозитория: %v", err)
+	default:
 		log.Printf("Открыт существующий репозиторий в %s", config.TargetDir)
 	}
 
+	return repo, nil
+}
+
+// MigrateToGit выполняет миграцию папок в Git-репозиторий
+func MigrateToGit(config Config, folders []FolderInfo) error {
+	if config.DryRun {
+		log.Println("Запущен тестовый режим (dry-run), Git-репозиторий не будет создан")
+		return nil
+	}
+
+	// Создаем директорию для репозитория, если её нет
+	if err := os.MkdirAll(config.TargetDir, 0755); err != nil {
+		return fmt.Errorf("ошибка создания директории: %v", err)
+	}
+
+	repo, err := openRepository(config)
+	if err != nil {
+		return err
+	}
+
 	// Получаем существующие версии, если используется режим добавления
 	existingVersions := make(map[string]bool)
 	if config.Append {
-		refs, err := repo.References()
-		if err != nil {
-			return fmt.Errorf("ошибка получения ссылок: %v", err)
+		commits, err := repo.Log(&git.LogOptions{})
+		if err != nil && err != plumbing.ErrReferenceNotFound {
+			return fmt.Errorf("ошибка получения истории: %v", err)
 		}
-		err = refs.ForEach(func(ref *plumbing.Reference) error {
-			if ref.Type() == plumbing.HashReference {
-				commit, err := repo.CommitObject(ref.Hash())
-				if err != nil {
-					return nil
-				}
+		// В репозитории без коммитов HEAD еще не указывает на коммит
+		if err == nil {
+			err = commits.ForEach(func(commit *object.Commit) error {
 				// Извлекаем версию из сообщения коммита
-				if strings.Contains(commit.Message, "Version") {
-					parts := strings.Split(commit.Message, ":")
-					if len(parts) > 0 {
-						version := strings.TrimSpace(strings.TrimPrefix(parts[0], "Version"))
-						existingVersions[version] = true
-					}
+				if m := versionMessageRe.FindStringSubmatch(commit.Message); m != nil {
+					existingVersions[strings.TrimSpace(m[1])] = true
 				}
+				return nil
+			})
+			if err != nil {
+				return fmt.Errorf("ошибка при анализе истории: %v", err)
 			}
-			return nil
-		})
-		if err != nil {
-			return fmt.Errorf("ошибка при анализе истории: %v", err)
+		}
+	}
+
+	// Читаем файл авторов один раз на всю миграцию
+	var authors map[string]authorInfo
+	if config.AuthorsFile != "" {
+		if authors, err = loadAuthors(config.AuthorsFile); err != nil {
+			log.Printf("Предупреждение: не удалось прочитать файл авторов %s: %v", config.AuthorsFile, err)
+		}
+	}
+
+	// Разбираем шаблон сообщения один раз на всю миграцию
+	tmpl := parseMessageTemplate(config.MessageTemplate)
+
+	// Быстрый импорт пишет версии сразу в базу объектов
+	if config.FastImport {
+		switch {
+		case config.Append:
+			log.Println("Быстрый импорт не поддерживает режим добавления, используется обычный импорт")
+		case !clearableDirectory(config.TargetDir):
+			// В конце быстрого импорта рабочая директория приводится к последнему
+			// коммиту, и лишние файлы в ней удаляются. Директории, которые обычный
+			// импорт не очищает, так обрабатывать нельзя
+			log.Printf("Быстрый импорт не может очищать директорию %s, используется обычный импорт", config.TargetDir)
+		default:
+			if config.HardLinks {
+				log.Println("Быстрый импорт не копирует файлы в рабочую директорию, жесткие ссылки не используются")
+			}
+			return importFolders(repo, config, authors, tmpl, folders)
 		}
 	}
 
@@ -188,25 +363,61 @@ func MigrateToGit(config Config, folders []FolderInfo) error {
 		return fmt.Errorf("ошибка получения рабочей директории: %v", err)
 	}
 
+	// Содержимое копируемых файлов сразу записывается в базу объектов,
+	// чтобы при добавлении в индекс не читать файлы второй раз
+	blobs := &blobSink{repo: repo}
+
+	// Рабочую директорию очищаем перед каждой версией только если не в режиме
+	// добавления (append) и если ее вообще можно очищать
+	clearTarget := !config.Append && clearableDirectory(config.TargetDir)
+
+	// Родитель каждого следующего коммита известен заранее, поэтому go-git
+	// не перечитывает HEAD перед каждым коммитом
+	var parents []plumbing.Hash
+	if head, err := repo.Head(); err == nil {
+		parents = []plumbing.Hash{head.Hash()}
+	} else if err != plumbing.ErrReferenceNotFound {
+		return fmt.Errorf("ошибка чтения HEAD: %v", err)
+	}
+
+	// Списки файлов версий собираются в фоне на шаг вперед: обход папки
+	// следующей версии идет, пока текущая копируется и коммитится
+	skipVersion := func(folder FolderInfo) bool {
+		return config.Append && existingVersions[folder.Version]
+	}
+	done := make(chan struct{})
+	defer close(done)
+	scans := prefetchCopyJobs(folders, config.TargetDir, skipVersion, done)
+
 	// Обрабатываем каждую папку
 	for _, folder := range folders {
+		scanned := <-scans
+
 		// Пропускаем существующие версии в режиме добавления
-		if config.Append && existingVersions[folder.Version] {
+		if skipVersion(folder) {
 			log.Printf("Пропуск версии %s, так как она уже существует в репозитории", folder.Version)
 			continue
 		}
 
 		log.Printf("Обработка папки: %s (версия: %s)", filepath.Base(folder.Path), folder.Version)
 
-		// Очищаем рабочую директорию только если не в режиме добавления (append)
-		if !config.Append {
-			if err := clearDirectory(config.TargetDir); err != nil {
+		// Список файлов версии
+		jobs, err := scanned.jobs, scanned.err
+		if err != nil {
+			return fmt.Errorf("ошибка копирования файлов: %v", err)
+		}
+
+		// Очищаем рабочую директорию. Файлы, не изменившиеся с прошлой версии
+		// (совпадают размер, права и время изменения), остаются на месте и не копируются заново
+		var kept map[string]bool
+		if clearTarget {
+			if kept, err = clearDirectory(config.TargetDir, jobs); err != nil {
 				return fmt.Errorf("ошибка очистки директории: %v", err)
 			}
 		}
 
 		// Копируем файлы и получаем список новых файлов
-		fileCount, newFiles, err := copyFilesAndTrack(folder.Path, config.TargetDir, config.Append)
+		fileCount, newFiles, err := copyFilesAndTrack(jobs, config.Append, kept, config.HardLinks, blobs)
 		if err != nil {
 			return fmt.Errorf("ошибка копирования файлов: %v", err)
 		}
@@ -216,89 +427,304 @@ func MigrateToGit(config Config, folders []FolderInfo) error {
 			continue
 		}
 
-		// Получаем информацию об авторе из файла, если он указан
-		authorName := config.Author
-		authorEmail := config.Email
-		if config.AuthorsFile != "" {
-			if name, email, err := getAuthorInfo(folder.Version, config.AuthorsFile); err == nil && name != "" && email != "" {
-				authorName = name
-				authorEmail = email
+		signature := versionSignature(config, authors, folder)
+		commitMsg := commitMessage(tmpl, folder, fileCount, signature.Name)
+
+		// Добавляем только новые файлы в индекс. Без режима добавления индекс
+		// собирается заново, как после git rm -r --cached: удаленные между
+		// версиями файлы попадают в коммит как удаления, а записи оставленных
+		// без изменений файлов переносятся без повторного хеширования
+		if err := addFilesToIndex(repo, config.TargetDir, newFiles, !config.Append, kept); err != nil {
+			return fmt.Errorf("ошибка обновления индекса: %v", err)
+		}
+
+		// Создаем коммит. Пустые коммиты разрешены: так go-git не сравнивает
+		// дерево с HEAD, а версия без изменений все равно попадает в историю
+		commit, err := worktree.Commit(commitMsg, &git.CommitOptions{
+			AllowEmptyCommits: true,
+			Author:            &signature,
+			Committer:         &signature,
+			Parents:           parents,
+		})
+
+		if err != nil {
+			return fmt.Errorf("ошибка создания коммита: %v", err)
+		}
+		parents = []plumbing.Hash{commit}
+
+		log.Printf("Создан коммит %s для версии %s", commit.String(), folder.Version)
+	}
+
+	return nil
+}
+
+// versionSignature возвращает подпись автора и коммиттера версии: автор берется из файла
+// авторов, если версия в нем есть, иначе из настроек; время — время создания версии
+func versionSignature(config Config, authors map[string]authorInfo, folder FolderInfo) object.Signature {
+	signature := object.Signature{
+		Name:  config.Author,
+		Email: config.Email,
+		When:  time.Unix(folder.CreationTime, 0),
+	}
+	if author, ok := authors[folder.Version]; ok && author.Name != "" && author.Email != "" {
+		signature.Name, signature.Email = author.Name, author.Email
+	}
+	return signature
+}
+
+// templatePart — часть шаблона сообщения: обычный текст или подстановка (field)
+type templatePart struct {
+	text  string
+	field string
+}
+
+// messageTemplate — шаблон сообщения коммита, разобранный на части
+type messageTemplate []templatePart
+
+// templateFields — подстановки, поддерживаемые в шаблоне сообщения
+var templateFields = map[string]bool{
+	"version": true,
+	"folder":  true,
+	"date":    true,
+	"files":   true,
+	"author":  true,
+}
+
+// parseMessageTemplate разбирает шаблон один раз, чтобы для каждого коммита
+// не искать все подстановки заново. Для пустого шаблона возвращает nil
+func parseMessageTemplate(template string) messageTemplate {
+	if template == "" {
+		return nil
+	}
+
+	var tmpl messageTemplate
+	text := ""
+	for template != "" {
+		start := strings.IndexByte(template, '{')
+		if start < 0 {
+			break
+		}
+		end := strings.IndexByte(template[start:], '}')
+		if end < 0 {
+			break
+		}
+		end += start
+
+		field := template[start+1 : end]
+		if !templateFields[field] {
+			// Неизвестная подстановка остается в сообщении как есть
+			text += template[:start+1]
+			template = template[start+1:]
+			continue
+		}
+
+		tmpl = append(tmpl, templatePart{text: text + template[:start], field: field})
+		text = ""
+		template = template[end+1:]
+	}
+	return append(tmpl, templatePart{text: text + template})
+}
+
+// commitMessage формирует сообщение коммита для папки с версией
+func commitMessage(tmpl messageTemplate, folder FolderInfo, fileCount int, authorName string) string {
+	if tmpl != nil {
+		var b strings.Builder
+		for _, part := range tmpl {
+			b.WriteString(part.text)
+			switch part.field {
+			case "version":
+				b.WriteString(folder.Version)
+			case "folder":
+				b.WriteString(filepath.Base(folder.Path))
+			case "date":
+				b.WriteString(formatCreationTime(folder.CreationTime))
+			case "files":
+				b.WriteString(strconv.Itoa(fileCount))
+			case "author":
+				b.WriteString(authorName)
+			}
+		}
+		return b.String()
+	}
+
+	return fmt.Sprintf("Version %s: %s (created: %s)",
+		folder.Version,
+		filepath.Base(folder.Path),
+		formatCreationTime(folder.CreationTime))
+}
+
+// addFilesToIndex добавляет файлы рабочей директории в индекс одной операцией
+func addFilesToIndex(repo *git.Repository, root string, files []stagedFile, replace bool, kept map[string]bool) error {
+	idx, err := repo.Storer.Index()
+	if err != nil {
+		return err
+	}
+
+	// Оставленные файлы, которых почему-то нет в индексе, добавляются заново.
+	// Они собираются отдельно, чтобы не копировать ради них весь список files
+	var missing []stagedFile
+	if replace {
+		retained := make(map[string]bool, len(kept))
+		entries := idx.Entries[:0]
+		for _, entry := range idx.Entries {
+			relPath := filepath.FromSlash(entry.Name)
+			if kept[relPath] {
+				entries = append(entries, entry)
+				retained[relPath] = true
 			}
 		}
+		idx.Entries = entries
 
-		// Формируем сообщение коммита
-		var commitMsg string
-		if config.MessageTemplate != "" {
-			commitMsg = strings.ReplaceAll(config.MessageTemplate, "{version}", folder.Version)
-			commitMsg = strings.ReplaceAll(commitMsg, "{folder}", filepath.Base(folder.Path))
-			commitMsg = strings.ReplaceAll(commitMsg, "{date}", time.Unix(folder.CreationTime, 0).Format("2006-01-02 15:04:05"))
-			commitMsg = strings.ReplaceAll(commitMsg, "{files}", fmt.Sprintf("%d", fileCount))
-			commitMsg = strings.ReplaceAll(commitMsg, "{author}", authorName)
-		} else {
-			commitMsg = fmt.Sprintf("Version %s: %s (created: %s)",
-				folder.Version,
-				filepath.Base(folder.Path),
-				time.Unix(folder.CreationTime, 0).Format("2006-01-02 15:04:05"))
+		for relPath := range kept {
+			if !retained[relPath] {
+				missing = append(missing, stagedFile{relPath: relPath})
+			}
 		}
+	}
 
-		// Добавляем только новые файлы в индекс
-		for _, file := range newFiles {
-			relPath, err := filepath.Rel(config.TargetDir, file)
-			if err != nil {
-				log.Printf("Предупреждение: не удалось получить относительный путь для %s: %v", file, err)
-				continue
+	// idx.Entry ищет запись перебором всего индекса, поэтому для списка
+	// файлов один раз строим отображение имени в запись
+	byName := make(map[string]*index.Entry, len(idx.Entries)+len(files)+len(missing))
+	for _, entry := range idx.Entries {
+		byName[entry.Name] = entry
+	}
+
+	rootPrefix := pathPrefix(filepath.Clean(root))
+	for _, batch := range [][]stagedFile{files, missing} {
+		for _, file := range batch {
+			relPath := file.relPath
+
+			// Для файлов, записанных при копировании, хеш и сведения о файле уже известны
+			hash, info := file.hash, file.info
+			if hash.IsZero() {
+				var err error
+				hash, info, err = storeBlob(repo, rootPrefix+relPath)
+				if err != nil {
+					log.Printf("Предупреждение: не удалось добавить файл %s: %v", relPath, err)
+					continue
+				}
 			}
-			_, err = worktree.Add(relPath)
+
+			mode, err := filemode.NewFromOSFileMode(info.Mode())
 			if err != nil {
 				log.Printf("Предупреждение: не удалось добавить файл %s: %v", relPath, err)
+				continue
 			}
+
+			// Имена в индексе всегда записываются через "/"
+			name := filepath.ToSlash(relPath)
+			entry, ok := byName[name]
+			if !ok {
+				entry = idx.Add(name)
+				byName[name] = entry
+			}
+			entry.Hash = hash
+			entry.Mode = mode
+			entry.ModifiedAt = info.ModTime()
+			entry.Size = uint32(info.Size())
 		}
+	}
 
-		// Создаем коммит
-		commit, err := worktree.Commit(commitMsg, &git.CommitOptions{
-			Author: &object.Signature{
-				Name:  authorName,
-				Email: authorEmail,
-				When:  time.Unix(folder.CreationTime, 0),
-			},
-		})
+	return repo.Storer.SetIndex(idx)
+}
 
-		if err != nil {
-			return fmt.Errorf("ошибка создания коммита: %v", err)
-		}
+// stagedFile — файл рабочей директории для добавления в индекс
+type stagedFile struct {
+	relPath string
+	hash    plumbing.Hash // хеш blob-объекта, если он уже записан при копировании
+	info    os.FileInfo   // сведения о файле при известном хеше
+}
 
-		log.Printf("Создан коммит %s для версии %s", commit.String(), folder.Version)
+// maxTeeBlobSize — наибольший размер файла, записываемого в репозиторий во время копирования
+const maxTeeBlobSize = 1 << 20
+
+// blobSink сохраняет blob-объекты копируемых файлов из нескольких горутин
+type blobSink struct {
+	mu   sync.Mutex
+	repo *git.Repository
+}
+
+// newBlob создает blob-объект указанного размера и возвращает его вместе с writer для содержимого
+func (b *blobSink) newBlob(size int64) (plumbing.EncodedObject, io.WriteCloser, error) {
+	obj := b.repo.Storer.NewEncodedObject()
+	obj.SetType(plumbing.BlobObject)
+	obj.SetSize(size)
+
+	writer, err := obj.Writer()
+	if err != nil {
+		return nil, nil, err
 	}
+	return obj, writer, nil
+}
 
-	return nil
+// store сохраняет заполненный blob-объект в репозитории
+func (b *blobSink) store(obj plumbing.EncodedObject) (plumbing.Hash, error) {
+	b.mu.Lock()
+	defer b.mu.Unlock()
+	return b.repo.Storer.SetEncodedObject(obj)
 }
 
-// clearDirectory удаляет все файлы и папки в указанной директории, кроме .git и системных директорий
-func clearDirectory(dir string) error {
-	// Список системных директорий и файлов, которые нужно игнорировать
-	systemDirs := map[string]bool{
-		".git":         true,
-		".Trash":       true,
-		".Trashes":     true,
-		".config":      true,
-		".cache":       true,
-		".local":       true,
-		"Library":      true,
-		"Applications": true,
-		"System":       true,
-		"Users":        true,
-		"bin":          true,
-		"etc":          true,
-		"usr":          true,
-		"var":          true,
-		"tmp":          true,
-		"opt":          true,
+// storeBlob записывает содержимое файла в хранилище объектов репозитория
+func storeBlob(repo *git.Repository, path string) (plumbing.Hash, os.FileInfo, error) {
+	file, err := os.Open(path)
+	if err != nil {
+		return plumbing.ZeroHash, nil, err
 	}
+	defer file.Close()
+
+	info, err := file.Stat()
+	if err != nil {
+		return plumbing.ZeroHash, nil, err
+	}
+
+	obj := repo.Storer.NewEncodedObject()
+	obj.SetType(plumbing.BlobObject)
+	obj.SetSize(info.Size())
 
+	writer, err := obj.Writer()
+	if err != nil {
+		return plumbing.ZeroHash, nil, err
+	}
+	if _, err := io.Copy(writer, file); err != nil {
+		writer.Close()
+		return plumbing.ZeroHash, nil, err
+	}
+	if err := writer.Close(); err != nil {
+		return plumbing.ZeroHash, nil, err
+	}
+
+	hash, err := repo.Storer.SetEncodedObject(obj)
+	return hash, info, err
+}
+
+// systemDirs — системные директории и файлы, которые никогда не удаляются при очистке
+var systemDirs = map[string]bool{
+	".git":         true,
+	".Trash":       true,
+	".Trashes":     true,
+	".config":      true,
+	".cache":       true,
+	".local":       true,
+	"Library":      true,
+	"Applications": true,
+	"System":       true,
+	"Users":        true,
+	"bin":          true,
+	"etc":          true,
+	"usr":          true,
+	"var":          true,
+	"tmp":          true,
+	"opt":          true,
+}
+
+// clearableDirectory проверяет, можно ли очищать указанную директорию: системные
+// директории и скрытые директории в домашней директории пользователя не очищаются.
+// Целевая директория одна на всю миграцию, поэтому проверка выполняется один раз
+func clearableDirectory(dir string) bool {
 	// Проверяем, не является ли директория системной
 	baseName := filepath.Base(dir)
 	if systemDirs[baseName] {
-		return nil // Пропускаем системные директории
+		return false // Пропускаем системные директории
 	}
 
 	// Проверяем, не находится ли директория в домашней директории пользователя
@@ -309,237 +735,673 @@ func clearDirectory(dir string) error {
 		if strings.HasPrefix(dir, homeDir) {
 			relPath, err := filepath.Rel(homeDir, dir)
 			if err == nil && strings.HasPrefix(relPath, ".") && !strings.Contains(relPath, "..") {
-				return nil
+				return false
 			}
 		}
 	}
 
-	entries, err := os.ReadDir(dir)
-	if err != nil {
-		return err
+	return true
+}
+
+// clearDirectory удаляет все файлы и папки в указанной директории, кроме .git и системных директорий.
+// Файлы, которые совпадают по размеру, правам и времени изменения с файлами следующей версии
+// из jobs, не удаляются; их относительные пути возвращаются, чтобы не копировать их заново.
+// Можно ли очищать саму директорию, проверяет вызывающий (см. clearableDirectory)
+func clearDirectory(dir string, jobs []copyJob) (map[string]bool, error) {
+	kept := make(map[string]bool)
+
+	plan := &clearPlan{
+		next: make(map[string]copyJob, len(jobs)),
+		kept: kept,
+	}
+	for _, job := range jobs {
+		plan.next[job.relPath] = job
 	}
 
-	for _, entry := range entries {
-		// Игнорируем системные директории и файлы
-		if systemDirs[entry.Name()] {
-			continue
+	if _, err := clearDirectoryContents(pathPrefix(filepath.Clean(dir)), "", plan); err != nil {
+		return kept, err
+	}
+
+	// Удаление — это в основном системные вызовы unlink, которые
+	// хорошо распараллеливаются, поэтому раздаем пути нескольким горутинам
+	removeAllParallel(plan.remove)
+	return kept, nil
+}
+
+// clearPlan описывает, что оставить при очистке рабочей директории
+type clearPlan struct {
+	next map[string]copyJob // файлы следующей версии по относительному пути
+	kept map[string]bool    // оставленные файлы (заполняется при очистке)
+
+	remove []string // файлы и директории к удалению (заполняется при очистке)
+}
+
+// clearDirectoryContents собирает в plan.remove содержимое директории, которое нужно удалить
+func clearDirectoryContents(dirPrefix, relPrefix string, plan *clearPlan) (bool, error) {
+	name := dirPrefix
+	if name == "" {
+		name = "."
+	}
+	dir, err := os.Open(name)
+	if err != nil {
+		return false, err
+	}
+	defer dir.Close()
+
+	// Записи читаются порциями в порядке файловой системы: os.ReadDir прочитал бы
+	// директорию целиком и отсортировал, хотя порядок здесь не важен
+	keptAny := false
+	for {
+		entries, err := dir.ReadDir(readDirBatch)
+		for _, entry := range entries {
+			kept, err := clearEntry(entry, dirPrefix, relPrefix, plan)
+			if err != nil {
+				return keptAny, err
+			}
+			keptAny = keptAny || kept
 		}
+		if err == io.EOF {
+			return keptAny, nil
+		}
+		if err != nil {
+			return keptAny, err
+		}
+	}
+}
 
-		path := filepath.Join(dir, entry.Name())
+// readDirBatch — сколько записей директории читается за один вызов при очистке
+const readDirBatch = 256
 
-		// Проверяем, не является ли файл символической ссылкой
-		fileInfo, err := os.Lstat(path)
+// clearEntry обрабатывает одну запись директории при очистке (см. clearDirectoryContents).
+// Возвращает true, если запись или что-то внутри нее остается
+func clearEntry(entry fs.DirEntry, dirPrefix, relPrefix string, plan *clearPlan) (bool, error) {
+	if protectedEntry(entry) {
+		return true, nil
+	}
+
+	path := dirPrefix + entry.Name()
+	relPath := relPrefix + entry.Name()
+
+	// Используем более безопасный подход к удалению файлов
+	if entry.IsDir() {
+		// Для директорий сначала собираем удаляемое содержимое. Директорию обходим,
+		// даже если в ней нет файлов следующей версии: вложенные системные записи
+		// и символические ссылки должны сохраниться. Файлы при этом не
+		// запрашиваются — имени и типа из чтения директории достаточно
+		start := len(plan.remove)
+		keptInside, err := clearDirectoryContents(path+string(filepath.Separator), relPath+string(filepath.Separator), plan)
 		if err != nil {
-			return fmt.Errorf("не удалось получить информацию о файле %s: %v", path, err)
+			// Если не удалось очистить поддиректорию, просто логируем ошибку и продолжаем
+			log.Printf("Предупреждение: %v", err)
+			return true, nil
+		}
+		// Директорию с оставленными файлами не удаляем
+		if keptInside {
+			return true, nil
 		}
+		// Иначе вместо ее содержимого удаляем всю директорию целиком,
+		// без удаления по одному файлу
+		plan.remove = append(plan.remove[:start], path)
+		return false, nil
+	}
 
-		// Пропускаем символические ссылки
-		if fileInfo.Mode()&os.ModeSymlink != 0 {
-			continue
+	// Файл не изменился в следующей версии — оставляем его. Размер, права и время
+	// изменения запрашиваются только у файлов, которые есть в следующей версии.
+	// copyFile сохраняет время изменения с полной точностью, поэтому время
+	// сравнивается точно: файл, измененный в ту же секунду, копируется заново
+	if job, ok := plan.next[relPath]; ok {
+		fileInfo, err := entry.Info()
+		if err != nil {
+			return false, fmt.Errorf("не удалось получить информацию о файле %s: %v", path, err)
+		}
+		if fileInfo.Size() == job.size && fileInfo.Mode() == job.mode && fileInfo.ModTime().Equal(job.modTime) {
+			plan.kept[relPath] = true
+			return true, nil
 		}
+	}
+	// Для файлов просто удаляем
+	plan.remove = append(plan.remove, path)
+	return false, nil
+}
 
-		// Используем более безопасный подход к удалению файлов
-		if entry.IsDir() {
-			// Для директорий сначала рекурсивно удаляем содержимое
-			if err := clearDirectory(path); err != nil {
-				// Если не удалось очистить поддиректорию, просто логируем ошибку и продолжаем
-				log.Printf("Предупреждение: %v", err)
-				continue
-			}
-			// Затем удаляем саму директорию
-			if err := os.Remove(path); err != nil {
-				// Если не удалось удалить директорию, просто логируем ошибку и продолжаем
-				log.Printf("Предупреждение: не удалось удалить директорию %s: %v", path, err)
-				continue
-			}
-		} else {
-			// Для файлов просто удаляем
-			if err := os.Remove(path); err != nil {
-				// Если не удалось удалить файл, просто логируем ошибку и продолжаем
-				log.Printf("Предупреждение: не удалось удалить файл %s: %v", path, err)
-				continue
+// protectedEntry проверяет, что запись рабочей директории не удаляется при очистке:
+// системные директории и файлы (включая .git) и символические ссылки. Имя и тип
+// берутся из результата чтения директории, без отдельного lstat для каждой записи
+func protectedEntry(entry fs.DirEntry) bool {
+	return systemDirs[entry.Name()] || entry.Type()&fs.ModeSymlink != 0
+}
+
+// removeAllParallel удаляет файлы и директории несколькими горутинами.
+// Пути не вложены друг в друга, поэтому удаляются независимо.
+// Ошибки не прерывают удаление и только логируются
+func removeAllParallel(paths []string) {
+	workers := min(runtime.NumCPU(), len(paths))
+
+	var (
+		wg   sync.WaitGroup
+		next atomic.Int64
+	)
+	for i := 0; i < workers; i++ {
+		wg.Add(1)
+		go func() {
+			defer wg.Done()
+			for {
+				n := int(next.Add(1) - 1)
+				if n >= len(paths) {
+					return
+				}
+				if err := os.RemoveAll(paths[n]); err != nil {
+					// Если не удалось удалить, просто логируем ошибку и продолжаем
+					log.Printf("Предупреждение: не удалось удалить %s: %v", paths[n], err)
+				}
 			}
-		}
+		}()
 	}
-	return nil
+	wg.Wait()
 }
 
-// copyFilesAndTrack копирует файлы из исходной директории в целевую и возвращает список новых файлов
-func copyFilesAndTrack(src, dst string, appendMode bool) (int, []string, error) {
-	fileCount := 0
-	var newFiles []string
-	ignoreDirs := []string{".git", "__pycache__", "venv", ".venv", "node_modules", ".idea", ".vscode", "dist", "build", "env"}
-	ignoreFiles := []string{".DS_Store", "*.pyc", "*.pyo", "*.pyd", ".gitignore", ".gitattributes", "*.swp", "*.swo", "*.log", "*.bak"}
+// ignoreDirs — служебные директории, которые не переносятся в репозиторий
+var ignoreDirs = map[string]bool{
+	".git":         true,
+	"__pycache__":  true,
+	"venv":         true,
+	".venv":        true,
+	"node_modules": true,
+	".idea":        true,
+	".vscode":      true,
+	"dist":         true,
+	"build":        true,
+	"env":          true,
+}
 
-	err := filepath.Walk(src, func(path string, info os.FileInfo, err error) error {
-		if err != nil {
-			return err
-		}
+// ignoreFileNames и ignoreFileExts — служебные файлы, которые не переносятся в репозиторий
+// (.DS_Store, *.pyc, *.pyo, *.pyd, .gitignore, .gitattributes, *.swp, *.swo, *.log, *.bak).
+// Все шаблоны — это точное имя или "*.расширение", поэтому вместо filepath.Match
+// для каждого шаблона достаточно двух поисков в map
+var ignoreFileNames = map[string]bool{
+	".DS_Store":      true,
+	".gitignore":     true,
+	".gitattributes": true,
+}
 
-		// Получаем относительный путь
-		relPath, err := filepath.Rel(src, path)
+var ignoreFileExts = map[string]bool{
+	".pyc": true,
+	".pyo": true,
+	".pyd": true,
+	".swp": true,
+	".swo": true,
+	".log": true,
+	".bak": true,
+}
+
+// isIgnoredFile проверяет, нужно ли пропустить файл с указанным именем
+func isIgnoredFile(name string) bool {
+	return ignoreFileNames[name] || ignoreFileExts[filepath.Ext(name)]
+}
+
+// creationTimeSkipDirs — директории, файлы которых не учитываются при определении
+// времени создания версии (скрытые директории пропускаются отдельно)
+var creationTimeSkipDirs = map[string]bool{
+	"__pycache__": true,
+	"venv":        true,
+	"env":         true,
+}
+
+// pathPrefix возвращает префикс, который filepath.Join(dir, name) добавляет к имени
+// для очищенного пути dir. Так пути внутри обхода строятся конкатенацией
+// и разбираются срезом строки, без нормализации в filepath.Join и filepath.Rel
+func pathPrefix(dir string) string {
+	switch {
+	case dir == ".":
+		return ""
+	case os.IsPathSeparator(dir[len(dir)-1]):
+		return dir
+	default:
+		return dir + string(filepath.Separator)
+	}
+}
+
+// walkSourceFiles обходит файлы версии в src, пропуская служебные директории и файлы,
+// и вызывает fn для каждого файла с полным и относительным путем
+func walkSourceFiles(src string, fn func(path, relPath string, d fs.DirEntry) error) error {
+	// WalkDir строит пути как filepath.Join(src, ...), поэтому все они,
+	// кроме самого src, начинаются с одного и того же префикса
+	src = filepath.Clean(src)
+	prefixLen := len(pathPrefix(src))
+
+	return filepath.WalkDir(src, func(path string, d fs.DirEntry, err error) error {
 		if err != nil {
+			// Недоступные вложенные файлы и папки пропускаем, а не прерываем копирование
+			if d != nil && path != src && errors.Is(err, fs.ErrPermission) {
+				log.Printf("Предупреждение: нет доступа к %s, пропускаем: %v", path, err)
+				if d.IsDir() {
+					return filepath.SkipDir
+				}
+				return nil
+			}
 			return err
 		}
 
 		// Пропускаем корневую директорию
-		if relPath == "." {
+		if path == src {
 			return nil
 		}
 
+		// Получаем относительный путь
+		relPath := path[prefixLen:]
+
+		name := d.Name()
+
 		// Проверяем, нужно ли игнорировать директорию
-		if info.IsDir() {
-			for _, ignoreDir := range ignoreDirs {
-				if info.Name() == ignoreDir {
-					return filepath.SkipDir
-				}
+		if d.IsDir() {
+			if ignoreDirs[name] {
+				return filepath.SkipDir
 			}
 			return nil
 		}
 
 		// Проверяем, нужно ли игнорировать файл
-		for _, pattern := range ignoreFiles {
-			matched, err := filepath.Match(pattern, info.Name())
-			if err != nil {
-				return err
+		if isIgnoredFile(name) {
+			return nil
+		}
+
+		return fn(path, relPath, d)
+	})
+}
+
+// collectCopyJobs обходит исходную папку версии и возвращает список файлов для копирования в dst
+func collectCopyJobs(src, dst string) ([]copyJob, error) {
+	var jobs []copyJob
+	dstPrefix := pathPrefix(filepath.Clean(dst))
+
+	err := walkSourceFiles(src, func(path, relPath string, d fs.DirEntry) error {
+		info, err := d.Info()
+		if err != nil {
+			return err
+		}
+		jobs = append(jobs, copyJob{
+			src:     path,
+			dst:     dstPrefix + relPath,
+			relPath: relPath,
+			size:    info.Size(),
+			modTime: info.ModTime(),
+			mode:    info.Mode(),
+			regular: d.Type().IsRegular(),
+		})
+		return nil
+	})
+
+	return jobs, err
+}
+
+// scannedFolder — список файлов версии, собранный заранее
+type scannedFolder struct {
+	jobs []copyJob
+	err  error
+}
+
+// prefetchCopyJobs собирает списки файлов версий в фоновой горутине и отдает их
+// в порядке folders, опережая обработку не больше чем на одну версию. Для версий,
+// для которых skip возвращает true, отдается пустой результат без обхода папки.
+// Горутина завершается, когда все списки отданы или закрыт done
+func prefetchCopyJobs(folders []FolderInfo, dst string, skip func(FolderInfo) bool, done <-chan struct{}) <-chan scannedFolder {
+	out := make(chan scannedFolder, 1)
+
+	go func() {
+		defer close(out)
+		for _, folder := range folders {
+			var scanned scannedFolder
+			if !skip(folder) {
+				scanned.jobs, scanned.err = collectCopyJobs(folder.Path, dst)
 			}
-			if matched {
-				return nil
+			select {
+			case out <- scanned:
+			case <-done:
+				return
 			}
 		}
+	}()
 
-		// Создаем директории в целевом пути
-		targetPath := filepath.Join(dst, relPath)
-		targetDir := filepath.Dir(targetPath)
-		if err := os.MkdirAll(targetDir, 0755); err != nil {
-			return err
+	return out
+}
+
+// copyFilesAndTrack копирует файлы версии и возвращает общее число ее файлов и список
+// новых файлов (пути относительно целевой директории). Файлы из kept уже лежат
+// в целевой директории без изменений и не копируются. При hardLinks вместо копий
+// создаются жесткие ссылки на исходные файлы (см. copyFile). Если задан blobs,
+// содержимое файлов, которые копируются чтением, сразу записывается в репозиторий
+func copyFilesAndTrack(jobs []copyJob, appendMode bool, kept map[string]bool, hardLinks bool, blobs *blobSink) (int, []stagedFile, error) {
+	pending := make([]copyJob, 0, len(jobs))
+	createdDirs := make(map[string]bool)
+	keptCount := 0
+
+	// Директории оставленных файлов заведомо существуют: clearDirectory их не
+	// удалял, и MkdirAll для них не нужен
+	for _, job := range jobs {
+		if kept[job.relPath] {
+			createdDirs[job.dstDir()] = true
+		}
+	}
+
+	for _, job := range jobs {
+		if kept[job.relPath] {
+			keptCount++
+			continue
+		}
+
+		// Создаем директории в целевом пути (каждую один раз)
+		targetDir := job.dstDir()
+		if !createdDirs[targetDir] {
+			if err := os.MkdirAll(targetDir, 0755); err != nil {
+				return 0, nil, err
+			}
+			createdDirs[targetDir] = true
 		}
 
 		// В режиме добавления проверяем, существует ли файл
 		if appendMode {
-			if _, err := os.Stat(targetPath); err == nil {
+			if _, err := os.Stat(job.dst); err == nil {
 				// Файл уже существует, пропускаем его
-				return nil
+				continue
 			}
 		}
 
-		// Копируем файл
-		if err := copyFile(path, targetPath); err != nil {
-			return err
+		pending = append(pending, job)
+	}
+
+	// Копируем файлы
+	if err := copyFilesParallel(pending, hardLinks, blobs); err != nil {
+		return 0, nil, err
+	}
+
+	// Добавляем новые файлы в список
+	newFiles := make([]stagedFile, 0, len(pending))
+	for _, job := range pending {
+		if !job.skipped {
+			newFiles = append(newFiles, stagedFile{relPath: job.relPath, hash: job.hash, info: job.info})
 		}
+	}
 
-		// Добавляем путь к новому файлу в список
-		newFiles = append(newFiles, targetPath)
-		fileCount++
-		return nil
-	})
+	return keptCount + len(newFiles), newFiles, nil
+}
 
-	return fileCount, newFiles, err
+// copyJob описывает копирование одного файла
+type copyJob struct {
+	src     string
+	dst     string
+	relPath string        // путь относительно корня версии
+	size    int64         // размер исходного файла
+	modTime time.Time     // время изменения исходного файла
+	mode    os.FileMode   // права исходного файла
+	regular bool          // исходная запись — обычный файл, а не символическая ссылка
+	skipped bool          // файл пропущен из-за отсутствия доступа
+	hash    plumbing.Hash // хеш blob-объекта, записанного при копировании
+	info    os.FileInfo   // сведения об исходном файле при известном хеше
 }
 
-// copyFiles копирует файлы из исходной директории в целевую (для обратной совместимости)
-func copyFiles(src, dst string, appendMode bool) (int, error) {
-	count, _, err := copyFilesAndTrack(src, dst, appendMode)
-	return count, err
+// dstDir возвращает директорию назначения с разделителем на конце (см. pathPrefix)
+func (job copyJob) dstDir() string {
+	name := job.relPath[strings.LastIndexByte(job.relPath, filepath.Separator)+1:]
+	dir := job.dst[:len(job.dst)-len(name)]
+	if dir == "" {
+		dir = "."
+	}
+	return dir
 }
 
-// copyFile копирует один файл
-func copyFile(src, dst string) error {
+// copyFilesParallel копирует файлы несколькими горутинами.
+// Копирование упирается в системные вызовы ввода-вывода, поэтому
+// воркеров больше, чем ядер. Возвращает первую возникшую ошибку.
+func copyFilesParallel(jobs []copyJob, hardLinks bool, blobs *blobSink) error {
+	workers := min(32, runtime.NumCPU()*4, len(jobs))
+
+	var (
+		wg       sync.WaitGroup
+		next     atomic.Int64
+		failed   atomic.Bool
+		errOnce  sync.Once
+		firstErr error
+	)
+	for i := 0; i < workers; i++ {
+		wg.Add(1)
+		go func() {
+			defer wg.Done()
+			for !failed.Load() {
+				n := int(next.Add(1) - 1)
+				if n >= len(jobs) {
+					return
+				}
+				// Жесткая ссылка на символическую ссылку указывала бы на саму ссылку,
+				// а не на файл, поэтому ссылки и прочие записи всегда копируются
+				hash, info, err := copyFile(jobs[n].src, jobs[n].dst, hardLinks && jobs[n].regular, blobs)
+				if err != nil {
+					// Нечитаемый исходный файл пропускаем, ошибки записи в цель не скрываем
+					var pathErr *fs.PathError
+					if errors.As(err, &pathErr) && pathErr.Path == jobs[n].src && errors.Is(err, fs.ErrPermission) {
+						log.Printf("Предупреждение: нет доступа к %s, пропускаем: %v", jobs[n].src, err)
+						jobs[n].skipped = true
+						continue
+					}
+					errOnce.Do(func() {
+						firstErr = err
+						failed.Store(true)
+					})
+					return
+				}
+				jobs[n].hash, jobs[n].info = hash, info
+			}
+		}()
+	}
+	wg.Wait()
+
+	return firstErr
+}
+
+// copyFile копирует один файл и возвращает хеш blob-объекта, если записал его в blobs
+func copyFile(src, dst string, hardLink bool, blobs *blobSink) (plumbing.Hash, os.FileInfo, error) {
+	if hardLink {
+		// Обычно файла назначения нет (его уже удалил clearDirectory), поэтому
+		// сразу создаем ссылку, а существующий файл удаляем только при конфликте
+		err := os.Link(src, dst)
+		if os.IsExist(err) {
+			if err := os.Remove(dst); err != nil {
+				return plumbing.ZeroHash, nil, err
+			}
+			err = os.Link(src, dst)
+		}
+		if err == nil {
+			return plumbing.ZeroHash, nil, nil
+		}
+	}
+
 	sourceFile, err := os.Open(src)
 	if err != nil {
-		return err
+		return plumbing.ZeroHash, nil, err
 	}
 	defer sourceFile.Close()
 
-	destFile, err := os.Create(dst)
+	sourceInfo, err := sourceFile.Stat()
 	if err != nil {
-		return err
+		return plumbing.ZeroHash, nil, err
+	}
+
+	destFile, err := createReplacing(dst)
+	if err != nil {
+		return plumbing.ZeroHash, nil, err
 	}
 	defer destFile.Close()
 
-	if _, err := io.Copy(destFile, sourceFile); err != nil {
-		return err
+	// Сначала пробуем reflink, иначе копируем данные
+	// (на Linux io.Copy между файлами использует copy_file_range)
+	var hash plumbing.Hash
+	if !cloneFile(destFile, sourceFile) {
+		if blobs == nil || sourceInfo.Size() > maxTeeBlobSize {
+			if _, err := io.Copy(destFile, sourceFile); err != nil {
+				return plumbing.ZeroHash, nil, err
+			}
+		} else if hash, err = copyAndStoreBlob(destFile, sourceFile, sourceInfo.Size(), blobs); err != nil {
+			return plumbing.ZeroHash, nil, err
+		}
 	}
 
-	sourceInfo, err := os.Stat(src)
-	if err != nil {
-		return err
+	if err := destFile.Chmod(sourceInfo.Mode()); err != nil {
+		return plumbing.ZeroHash, nil, err
 	}
 
-	return os.Chmod(dst, sourceInfo.Mode())
+	// Сохраняем время изменения, чтобы следующая версия могла сравнить файлы без чтения
+	if err := os.Chtimes(dst, sourceInfo.ModTime(), sourceInfo.ModTime()); err != nil {
+		return plumbing.ZeroHash, nil, err
+	}
+	return hash, sourceInfo, nil
 }
 
-// getAuthorInfo получает информацию об авторе из файла сопоставления
-func getAuthorInfo(version string, authorsFile string) (string, string, error) {
-	if authorsFile == "" {
-		return "", "", nil
+// createReplacing создает новый файл вместо существующего, не записывая в старый:
+// он может быть жесткой ссылкой на исходный файл из предыдущего запуска
+func createReplacing(path string) (*os.File, error) {
+	f, err := os.OpenFile(path, os.O_WRONLY|os.O_CREATE|os.O_EXCL, 0666)
+	if !os.IsExist(err) {
+		return f, err
+	}
+	if err := os.Remove(path); err != nil {
+		return nil, err
 	}
+	return os.OpenFile(path, os.O_WRONLY|os.O_CREATE|os.O_EXCL, 0666)
+}
 
+// copyAndStoreBlob копирует src в dst, одновременно записывая содержимое в blob-объект
+func copyAndStoreBlob(dst io.Writer, src io.Reader, size int64, blobs *blobSink) (plumbing.Hash, error) {
+	obj, writer, err := blobs.newBlob(size)
+	if err != nil {
+		return plumbing.ZeroHash, err
+	}
+	if _, err := io.Copy(io.MultiWriter(dst, writer), src); err != nil {
+		writer.Close()
+		return plumbing.ZeroHash, err
+	}
+	if err := writer.Close(); err != nil {
+		return plumbing.ZeroHash, err
+	}
+	return blobs.store(obj)
+}
+
+// authorInfo — автор версии из файла сопоставления
+type authorInfo struct {
+	Name  string
+	Email string
+}
+
+// loadAuthors читает файл сопоставления версий и авторов (строки "версия:имя:email").
+// Если версия указана несколько раз, используется первая строка
+func loadAuthors(authorsFile string) (map[string]authorInfo, error) {
 	data, err := os.ReadFile(authorsFile)
 	if err != nil {
-		return "", "", err
+		return nil, err
 	}
 
-	lines := strings.Split(string(data), "\n")
-	for _, line := range lines {
-		line = strings.TrimSpace(line)
-		if line == "" || strings.HasPrefix(line, "#") {
+	// Разбираем байты файла на месте: строки создаются только для полей
+	// принятых записей, без копии всего файла и среза всех его строк
+	authors := make(map[string]authorInfo)
+	for len(data) > 0 {
+		var line []byte
+		line, data, _ = bytes.Cut(data, []byte{'\n'})
+		line = bytes.TrimSpace(line)
+		if len(line) == 0 || line[0] == '#' {
+			continue
+		}
+
+		version, rest, ok := bytes.Cut(line, []byte{':'})
+		if !ok {
+			continue
+		}
+		name, rest, ok := bytes.Cut(rest, []byte{':'})
+		if !ok {
 			continue
 		}
+		email, _, _ := bytes.Cut(rest, []byte{':'})
 
-		parts := strings.Split(line, ":")
-		if len(parts) >= 3 && parts[0] == version {
-			return parts[1], parts[2], nil
+		if _, ok := authors[string(version)]; !ok {
+			authors[string(version)] = authorInfo{Name: string(name), Email: string(email)}
 		}
 	}
 
-	return "", "", nil
+	return authors, nil
 }
 
-// getFolderCreationTime получает время создания папки на основе анализа файлов
-func getFolderCreationTime(folderPath string) int64 {
-	var fileTimes []int64
-	keyFilePatterns := []string{
-		"version.py", "version.txt", "VERSION",
-		"main.py", "app.py", "bot.py", "config.py",
-		"requirements.txt", "setup.py",
-		"Dockerfile", "docker-compose.yml",
+// keyFilePatterns — фрагменты имен ключевых файлов проекта (в нижнем регистре),
+// время изменения которых учитывается при расчете медианы с двойным весом
+var keyFilePatterns = []string{
+	"version.py", "version.txt", "version",
+	"main.py", "app.py", "bot.py", "config.py",
+	"requirements.txt", "setup.py",
+	"dockerfile", "docker-compose.yml",
+}
+
+// folderCreationTime возвращает время создания папки, используя кэш предыдущих запусков:
+// файлы папки анализируются, только если сама папка изменилась
+func folderCreationTime(timeCache *creationTimeCache, path string, info os.FileInfo) int64 {
+	key, err := filepath.Abs(path)
+	if err != nil {
+		key = path
+	}
+	dirModTime := info.ModTime().UnixNano()
+
+	if creationTime, ok := timeCache.get(key, dirModTime); ok {
+		return creationTime
 	}
 
+	creationTime, ok := getFolderCreationTime(path)
+	if ok {
+		timeCache.put(key, dirModTime, creationTime)
+	}
+	return creationTime
+}
+
+// getFolderCreationTime получает время создания папки на основе анализа файлов.
+// Второе значение равно false, если времена файлов получить не удалось
+// и возвращено текущее время
+func getFolderCreationTime(folderPath string) (int64, bool) {
+	var fileTimes []int64
+
 	processedFiles := 0
 	maxFiles := 500
 
-	err := filepath.Walk(folderPath, func(path string, info os.FileInfo, err error) error {
+	// WalkDir не вызывает lstat для каждой записи: тип берется из dirent,
+	// а время модификации запрашиваем только для учитываемых файлов
+	err := filepath.WalkDir(folderPath, func(path string, d fs.DirEntry, err error) error {
 		if err != nil {
 			return nil
 		}
 
+		name := d.Name()
+
 		// Пропускаем служебные директории
-		if info.IsDir() {
-			base := filepath.Base(path)
-			if strings.HasPrefix(base, ".") || base == "__pycache__" ||
-				base == "venv" || base == "env" || base == ".venv" {
+		if d.IsDir() {
+			if strings.HasPrefix(name, ".") || creationTimeSkipDirs[name] {
 				return filepath.SkipDir
 			}
 			return nil
 		}
 
 		if processedFiles >= maxFiles {
-			return filepath.SkipDir
+			return filepath.SkipAll
 		}
 
 		// Пропускаем служебные файлы
-		base := filepath.Base(path)
-		if strings.HasPrefix(base, ".") || strings.HasSuffix(base, ".pyc") {
+		if strings.HasPrefix(name, ".") || strings.HasSuffix(name, ".pyc") {
 			return nil
 		}
 
+		info, err := d.Info()
+		if err != nil {
+			return nil
+		}
 		modTime := info.ModTime().Unix()
 		fileTimes = append(fileTimes, modTime)
 
 		// Проверяем, является ли файл ключевым
+		lowerName := strings.ToLower(name)
 		for _, pattern := range keyFilePatterns {
-			if strings.Contains(strings.ToLower(base), strings.ToLower(pattern)) {
+			if strings.Contains(lowerName, pattern) {
 				fileTimes = append(fileTimes, modTime)
 				break
 			}
@@ -551,13 +1413,42 @@ func getFolderCreationTime(folderPath string) int64 {
 
 	if err != nil || len(fileTimes) == 0 {
 		// Если не удалось получить времена файлов, возвращаем текущее время
-		return time.Now().Unix()
+		return time.Now().Unix(), false
 	}
 
-	// Сортируем времена и берем медиану
-	sort.Slice(fileTimes, func(i, j int) bool {
-		return fileTimes[i] < fileTimes[j]
-	})
+	// Берем медиану без полной сортировки
+	return selectKth(fileTimes, len(fileTimes)/2), true
+}
 
-	return fileTimes[len(fileTimes)/2]
+// selectKth возвращает k-й по возрастанию элемент (quickselect, O(n) в среднем).
+// Порядок элементов в times при этом меняется.
+func selectKth(times []int64, k int) int64 {
+	lo, hi := 0, len(times)-1
+	for lo < hi {
+		// Опорный элемент из середины, разбиение Хоара
+		pivot := times[lo+(hi-lo)/2]
+		i, j := lo, hi
+		for i <= j {
+			for times[i] < pivot {
+				i++
+			}
+			for times[j] > pivot {
+				j--
+			}
+			if i <= j {
+				times[i], times[j] = times[j], times[i]
+				i++
+				j--
+			}
+		}
+		switch {
+		case k <= j:
+			hi = j
+		case k >= i:
+			lo = i
+		default:
+			return times[k]
+		}
+	}
+	return times[k]
 }
@@ -0,0 +1,281 @@
+package gitconverter
+
+import (
+	"os"
+	"path/filepath"
+	"slices"
+	"testing"
+	"time"
+
+	"github.com/go-git/go-git/v5"
+	"github.com/go-git/go-git/v5/plumbing"
+	"github.com/go-git/go-git/v5/plumbing/object"
+)
+
+// writeVersion создает папку версии с файлами и заданным временем изменения
+func writeVersion(t *testing.T, dir string, files map[string]string, modTimes map[string]time.Time) {
+	t.Helper()
+	for name, content := range files {
+		path := filepath.Join(dir, name)
+		if err := os.MkdirAll(filepath.Dir(path), 0755); err != nil {
+			t.Fatal(err)
+		}
+		if err := os.WriteFile(path, []byte(content), 0644); err != nil {
+			t.Fatal(err)
+		}
+		if err := os.Chtimes(path, modTimes[name], modTimes[name]); err != nil {
+			t.Fatal(err)
+		}
+	}
+}
+
+// treeFiles возвращает содержимое файлов дерева коммита
+func treeFiles(t *testing.T, commit *object.Commit) map[string]string {
+	t.Helper()
+	tree, err := commit.Tree()
+	if err != nil {
+		t.Fatal(err)
+	}
+	files := make(map[string]string)
+	err = tree.Files().ForEach(func(f *object.File) error {
+		content, err := f.Contents()
+		files[f.Name] = content
+		return err
+	})
+	if err != nil {
+		t.Fatal(err)
+	}
+	return files
+}
+
+func TestMigrateToGitKeepsOnlyUnchangedFiles(t *testing.T) {
+	source := t.TempDir()
+	target := t.TempDir()
+
+	// Время без долей секунды: измененный файл второй версии отличается
+	// от первой только на полсекунды и имеет тот же размер
+	base := time.Unix(1700000000, 0)
+	v1 := filepath.Join(source, "v1")
+	v2 := filepath.Join(source, "v2")
+	writeVersion(t, v1,
+		map[string]string{"same.txt": "same", "changed.txt": "old!", "deleted.txt": "gone"},
+		map[string]time.Time{"same.txt": base, "changed.txt": base, "deleted.txt": base})
+	writeVersion(t, v2,
+		map[string]string{"same.txt": "same", "changed.txt": "new!"},
+		map[string]time.Time{"same.txt": base, "changed.txt": base.Add(500 * time.Millisecond)})
+
+	config := Config{
+		SourceDir: source,
+		TargetDir: target,
+		Author:    "Developer",
+		Email:     "dev@example.com",
+	}
+	folders := []FolderInfo{
+		{Path: v1, Version: "1", CreationTime: base.Unix()},
+		{Path: v2, Version: "2", CreationTime: base.Unix() + 60},
+	}
+	if err := MigrateToGit(config, folders); err != nil {
+		t.Fatal(err)
+	}
+
+	repo, err := git.PlainOpen(target)
+	if err != nil {
+		t.Fatal(err)
+	}
+	head, err := repo.Head()
+	if err != nil {
+		t.Fatal(err)
+	}
+	second, err := repo.CommitObject(head.Hash())
+	if err != nil {
+		t.Fatal(err)
+	}
+	first, err := second.Parent(0)
+	if err != nil {
+		t.Fatal(err)
+	}
+
+	want1 := map[string]string{"same.txt": "same", "changed.txt": "old!", "deleted.txt": "gone"}
+	want2 := map[string]string{"same.txt": "same", "changed.txt": "new!"}
+	for _, c := range []struct {
+		commit *object.Commit
+		want   map[string]string
+	}{{first, want1}, {second, want2}} {
+		got := treeFiles(t, c.commit)
+		if len(got) != len(c.want) {
+			t.Errorf("коммит %s: файлы %v, ожидались %v", c.commit.Hash, got, c.want)
+			continue
+		}
+		for name, content := range c.want {
+			if got[name] != content {
+				t.Errorf("коммит %s: %s = %q, ожидалось %q", c.commit.Hash, name, got[name], content)
+			}
+		}
+	}
+}
+
+// commitTrees возвращает хеши деревьев коммитов ветки от первого к последнему
+func commitTrees(t *testing.T, target string) []plumbing.Hash {
+	t.Helper()
+	repo, err := git.PlainOpen(target)
+	if err != nil {
+		t.Fatal(err)
+	}
+	head, err := repo.Head()
+	if err != nil {
+		t.Fatal(err)
+	}
+	commit, err := repo.CommitObject(head.Hash())
+	if err != nil {
+		t.Fatal(err)
+	}
+
+	var trees []plumbing.Hash
+	for {
+		trees = append(trees, commit.TreeHash)
+		if len(commit.ParentHashes) == 0 {
+			break
+		}
+		if commit, err = commit.Parent(0); err != nil {
+			t.Fatal(err)
+		}
+	}
+	slices.Reverse(trees)
+	return trees
+}
+
+// lastTreeFiles возвращает содержимое файлов последнего коммита ветки
+func lastTreeFiles(t *testing.T, target string) map[string]string {
+	t.Helper()
+	repo, err := git.PlainOpen(target)
+	if err != nil {
+		t.Fatal(err)
+	}
+	head, err := repo.Head()
+	if err != nil {
+		t.Fatal(err)
+	}
+	commit, err := repo.CommitObject(head.Hash())
+	if err != nil {
+		t.Fatal(err)
+	}
+	return treeFiles(t, commit)
+}
+
+func TestFastImportMatchesNormalImport(t *testing.T) {
+	source := t.TempDir()
+	base := time.Unix(1700000000, 0)
+	later := base.Add(time.Hour)
+
+	// Имена a, a.txt, a-b.txt, a0.txt и a/b проверяют порядок записей дерева:
+	// Git сортирует директории так, будто к их имени добавлен "/"
+	v1 := filepath.Join(source, "v1")
+	v2 := filepath.Join(source, "v2")
+	writeVersion(t, v1,
+		map[string]string{
+			"a": "file a", "a.txt": "a.txt", "a0.txt": "a0", "b/c/d.txt": "deep",
+			"b/e.txt": "e1", "keep.txt": "keep", "deleted.txt": "gone", "locked.txt": "locked",
+		},
+		map[string]time.Time{
+			"a": base, "a.txt": base, "a0.txt": base, "b/c/d.txt": base,
+			"b/e.txt": base, "keep.txt": base, "deleted.txt": base, "locked.txt": base,
+		})
+	// keep.txt меняет содержимое, но не размер, права и время изменения:
+	// оба режима считают такой файл неизмененным и берут его из первой версии
+	writeVersion(t, v2,
+		map[string]string{
+			"a/b": "now a dir", "a.txt": "a.txt changed", "a-b.txt": "dash", "a0.txt": "a0",
+			"b/c/d.txt": "deep", "b/e.txt": "e2", "keep.txt": "KEEP",
+		},
+		map[string]time.Time{
+			"a/b": later, "a.txt": later, "a-b.txt": later, "a0.txt": base,
+			"b/c/d.txt": base, "b/e.txt": later, "keep.txt": base,
+		})
+
+	// Нечитаемый файл пропускается обоими режимами. Под root права доступа
+	// не мешают чтению, и эта часть проверки не выполняется
+	locked := filepath.Join(v1, "locked.txt")
+	if err := os.Chmod(locked, 0); err != nil {
+		t.Fatal(err)
+	}
+	t.Cleanup(func() { os.Chmod(locked, 0644) })
+	lockedReadable := true
+	if f, err := os.Open(locked); err == nil {
+		f.Close()
+	} else {
+		lockedReadable = false
+	}
+
+	folders := []FolderInfo{
+		{Path: v1, Version: "1", CreationTime: base.Unix()},
+		{Path: v2, Version: "2", CreationTime: base.Unix() + 60},
+	}
+	migrate := func(target string, fast bool) {
+		t.Helper()
+		config := Config{
+			SourceDir:  source,
+			TargetDir:  target,
+			Author:     "Developer",
+			Email:      "dev@example.com",
+			FastImport: fast,
+		}
+		if err := MigrateToGit(config, folders); err != nil {
+			t.Fatal(err)
+		}
+	}
+
+	normalTarget := t.TempDir()
+	fastTarget := t.TempDir()
+	migrate(normalTarget, false)
+	migrate(fastTarget, true)
+
+	normalTrees := commitTrees(t, normalTarget)
+	fastTrees := commitTrees(t, fastTarget)
+	if !slices.Equal(normalTrees, fastTrees) {
+		t.Fatalf("деревья быстрого импорта %v, обычного %v", fastTrees, normalTrees)
+	}
+
+	want := map[string]string{
+		"a/b": "now a dir", "a.txt": "a.txt changed", "a-b.txt": "dash", "a0.txt": "a0",
+		"b/c/d.txt": "deep", "b/e.txt": "e2", "keep.txt": "keep",
+	}
+	got := lastTreeFiles(t, fastTarget)
+	if len(got) != len(want) {
+		t.Errorf("файлы последней версии %v, ожидались %v", got, want)
+	}
+	for name, content := range want {
+		if got[name] != content {
+			t.Errorf("%s = %q, ожидалось %q", name, got[name], content)
+		}
+	}
+
+	if !lockedReadable {
+		repo, err := git.PlainOpen(fastTarget)
+		if err != nil {
+			t.Fatal(err)
+		}
+		tree, err := repo.TreeObject(fastTrees[0])
+		if err != nil {
+			t.Fatal(err)
+		}
+		if _, err := tree.File("locked.txt"); err == nil {
+			t.Error("нечитаемый файл попал в дерево")
+		}
+	}
+
+	// Повторный быстрый импорт берет дерево неизмененной папки из кэша, не читая
+	// файлы: новое содержимое того же размера и времени изменения в него не попадает
+	eFile := filepath.Join(v2, "b", "e.txt")
+	if err := os.WriteFile(eFile, []byte("E2"), 0644); err != nil {
+		t.Fatal(err)
+	}
+	if err := os.Chtimes(eFile, later, later); err != nil {
+		t.Fatal(err)
+	}
+	migrate(fastTarget, true)
+
+	rerunTrees := commitTrees(t, fastTarget)
+	if len(rerunTrees) != 4 || rerunTrees[3] != fastTrees[1] {
+		t.Errorf("повторный импорт: деревья %v, ожидалось повторное использование %s", rerunTrees, fastTrees[1])
+	}
+}
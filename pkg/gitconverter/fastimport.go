@@ -0,0 +1,309 @@
+package gitconverter
+
+import (
+	"cmp"
+	"crypto/sha256"
+	"encoding/hex"
+	"errors"
+	"fmt"
+	"io/fs"
+	"log"
+	"os"
+	"path/filepath"
+	"slices"
+	"strings"
+	"time"
+
+	"github.com/go-git/go-billy/v5"
+	"github.com/go-git/go-git/v5"
+	"github.com/go-git/go-git/v5/plumbing"
+	"github.com/go-git/go-git/v5/plumbing/filemode"
+	"github.com/go-git/go-git/v5/plumbing/object"
+)
+
+// importFolders записывает версии напрямую в базу объектов Git (аналог git fast-import):
+// для каждой папки создаются blob-объекты файлов, деревья и коммит. Файлы не копируются
+// в рабочую директорию и не проходят через индекс — рабочая директория один раз
+// приводится к последнему коммиту в конце импорта
+func importFolders(repo *git.Repository, config Config, authors map[string]authorInfo, tmpl messageTemplate, folders []FolderInfo) error {
+	// Определяем ветку, на которую указывает HEAD, и ее текущий коммит
+	headRef, err := repo.Storer.Reference(plumbing.HEAD)
+	if err != nil {
+		return fmt.Errorf("ошибка чтения HEAD: %v", err)
+	}
+	branch := plumbing.HEAD
+	if headRef.Type() == plumbing.SymbolicReference {
+		branch = headRef.Target()
+	}
+
+	var parent plumbing.Hash
+	if head, err := repo.Head(); err == nil {
+		parent = head.Hash()
+	} else if err != plumbing.ErrReferenceNotFound {
+		return fmt.Errorf("ошибка чтения HEAD: %v", err)
+	}
+
+	// Деревья версий из предыдущих запусков: неизмененная папка не читается заново,
+	// если ее дерево уже есть в репозитории
+	trees := loadTreeCache(filepath.Join(gitDir(repo, config.TargetDir), treeCacheFile))
+
+	// Blob-объекты файлов предыдущей версии: файл с тем же путем, размером, правами
+	// и временем изменения не читается и не хешируется заново, а ссылается на уже
+	// записанный объект
+	var prevBlobs map[string]importedBlob
+
+	imported := 0
+	for _, folder := range folders {
+		log.Printf("Обработка папки: %s (версия: %s)", filepath.Base(folder.Path), folder.Version)
+
+		var files []sourceFile
+		err := walkSourceFiles(folder.Path, func(path, relPath string, d fs.DirEntry) error {
+			file := sourceFile{path: path, name: filepath.ToSlash(relPath)}
+			// Для символических ссылок сведения о самой ссылке не подходят:
+			// storeBlob читает файл, на который она указывает
+			if d.Type()&fs.ModeSymlink == 0 {
+				file.info, _ = d.Info()
+			}
+			files = append(files, file)
+			return nil
+		})
+		if err != nil {
+			return fmt.Errorf("ошибка чтения файлов: %v", err)
+		}
+
+		fileCount := len(files)
+		fingerprint := folderFingerprint(files)
+		treeHash, ok := trees.get(fingerprint)
+		if fileCount > 0 && ok && repo.Storer.HasEncodedObject(treeHash) == nil {
+			if config.Verbose {
+				log.Printf("Папка %s не изменилась, используется дерево %s", filepath.Base(folder.Path), treeHash)
+			}
+			prevBlobs = nil
+		} else if fileCount > 0 {
+			var skipped int
+			treeHash, prevBlobs, skipped, err = writeFolderTree(repo, files, prevBlobs)
+			if err != nil {
+				return err
+			}
+			fileCount -= skipped
+			// Дерево, из которого выпали нечитаемые файлы, не кэшируем: когда доступ к ним
+			// появится, папку нужно прочитать заново
+			if skipped == 0 {
+				trees.put(fingerprint, treeHash)
+			}
+		}
+
+		if fileCount == 0 {
+			prevBlobs = nil
+			log.Printf("В папке %s не найдено файлов для добавления", filepath.Base(folder.Path))
+			continue
+		}
+
+		signature := versionSignature(config, authors, folder)
+		commit := &object.Commit{
+			Author:    signature,
+			Committer: signature,
+			Message:   commitMessage(tmpl, folder, fileCount, signature.Name),
+			TreeHash:  treeHash,
+		}
+		if !parent.IsZero() {
+			commit.ParentHashes = []plumbing.Hash{parent}
+		}
+
+		hash, err := storeObject(repo, commit)
+		if err != nil {
+			return fmt.Errorf("ошибка создания коммита: %v", err)
+		}
+		parent = hash
+		imported++
+
+		log.Printf("Создан коммит %s для версии %s", hash.String(), folder.Version)
+	}
+
+	if err := trees.save(); err != nil {
+		log.Printf("Предупреждение: не удалось сохранить кэш деревьев: %v", err)
+	}
+
+	if imported == 0 {
+		return nil
+	}
+
+	// Переводим ветку на последний коммит и один раз обновляем рабочую директорию
+	if err := repo.Storer.SetReference(plumbing.NewHashReference(branch, parent)); err != nil {
+		return fmt.Errorf("ошибка обновления ветки: %v", err)
+	}
+
+	worktree, err := repo.Worktree()
+	if err != nil {
+		return fmt.Errorf("ошибка получения рабочей директории: %v", err)
+	}
+	if err := worktree.Reset(&git.ResetOptions{Commit: parent, Mode: git.HardReset}); err != nil {
+		return fmt.Errorf("ошибка обновления рабочей директории: %v", err)
+	}
+
+	return nil
+}
+
+// gitDir возвращает каталог репозитория. Обычно это .git в рабочей директории,
+// но .git может быть и файлом со ссылкой на каталог в другом месте (gitdir:)
+func gitDir(repo *git.Repository, workDir string) string {
+	if storage, ok := repo.Storer.(interface{ Filesystem() billy.Filesystem }); ok {
+		return storage.Filesystem().Root()
+	}
+	return filepath.Join(workDir, git.GitDirName)
+}
+
+// sourceFile — файл версии для быстрого импорта
+type sourceFile struct {
+	path string
+	name string      // путь относительно корня версии через "/"
+	info os.FileInfo // nil для символических ссылок и при ошибке чтения сведений
+}
+
+// folderFingerprint вычисляет отпечаток версии по путям, размерам, правам и временам
+// изменения файлов — без чтения содержимого. Пустая строка означает, что отпечаток
+// построить нельзя (есть файлы без сведений)
+func folderFingerprint(files []sourceFile) string {
+	h := sha256.New()
+	for _, file := range files {
+		if file.info == nil {
+			return ""
+		}
+		fmt.Fprintf(h, "%s\x00%d %d %o\n", file.name, file.info.Size(), file.info.ModTime().UnixNano(), file.info.Mode())
+	}
+	return hex.EncodeToString(h.Sum(nil))
+}
+
+// writeFolderTree записывает blob-объекты файлов версии и ее дерево. Файлы, совпадающие
+// с prevBlobs по размеру, правам и времени изменения, не читаются. Нечитаемые файлы,
+// как и при обычном импорте, пропускаются с предупреждением. Возвращает хеш дерева,
+// blob-объекты этой версии для следующей и число пропущенных файлов
+func writeFolderTree(repo *git.Repository, files []sourceFile, prevBlobs map[string]importedBlob) (plumbing.Hash, map[string]importedBlob, int, error) {
+	root := newTreeDir()
+	blobs := make(map[string]importedBlob, len(files))
+	skipped := 0
+
+	for _, file := range files {
+		var blob importedBlob
+		if file.info != nil {
+			blob.size, blob.modTime = file.info.Size(), file.info.ModTime()
+			prev, ok := prevBlobs[file.name]
+			if ok && prev.size == blob.size && prev.modTime.Equal(blob.modTime) {
+				if mode, err := filemode.NewFromOSFileMode(file.info.Mode()); err == nil && mode == prev.mode {
+					blob = prev
+				}
+			}
+		}
+
+		if blob.hash.IsZero() {
+			hash, info, err := storeBlob(repo, file.path)
+			// Нечитаемый исходный файл пропускаем, ошибки записи в репозиторий не скрываем
+			var pathErr *fs.PathError
+			if errors.As(err, &pathErr) && pathErr.Path == file.path && errors.Is(err, fs.ErrPermission) {
+				log.Printf("Предупреждение: нет доступа к %s, пропускаем: %v", file.path, err)
+				skipped++
+				continue
+			}
+			if err != nil {
+				return plumbing.ZeroHash, nil, 0, fmt.Errorf("ошибка чтения файлов: %v", err)
+			}
+			mode, err := filemode.NewFromOSFileMode(info.Mode())
+			if err != nil {
+				return plumbing.ZeroHash, nil, 0, fmt.Errorf("ошибка чтения файлов: %v", err)
+			}
+			blob.hash, blob.mode = hash, mode
+		}
+
+		if !blob.modTime.IsZero() {
+			blobs[file.name] = blob
+		}
+		root.add(file.name, blob.mode, blob.hash)
+	}
+
+	treeHash, err := root.write(repo)
+	if err != nil {
+		return plumbing.ZeroHash, nil, 0, fmt.Errorf("ошибка записи дерева: %v", err)
+	}
+	return treeHash, blobs, skipped, nil
+}
+
+// importedBlob — записанный blob-объект файла и сведения для проверки его неизменности
+type importedBlob struct {
+	size    int64
+	modTime time.Time
+	mode    filemode.FileMode
+	hash    plumbing.Hash
+}
+
+// treeDir — директория, из которой собирается объект дерева Git
+type treeDir struct {
+	files map[string]object.TreeEntry
+	dirs  map[string]*treeDir
+}
+
+func newTreeDir() *treeDir {
+	return &treeDir{
+		files: make(map[string]object.TreeEntry),
+		dirs:  make(map[string]*treeDir),
+	}
+}
+
+// add добавляет файл по пути с разделителями "/"
+func (t *treeDir) add(path string, mode filemode.FileMode, hash plumbing.Hash) {
+	dir := t
+	for {
+		i := strings.IndexByte(path, '/')
+		if i < 0 {
+			break
+		}
+		name := path[:i]
+		sub, ok := dir.dirs[name]
+		if !ok {
+			sub = newTreeDir()
+			dir.dirs[name] = sub
+		}
+		dir = sub
+		path = path[i+1:]
+	}
+	dir.files[path] = object.TreeEntry{Name: path, Mode: mode, Hash: hash}
+}
+
+// write записывает дерево и все вложенные деревья, возвращает хеш корня
+func (t *treeDir) write(repo *git.Repository) (plumbing.Hash, error) {
+	entries := make([]object.TreeEntry, 0, len(t.files)+len(t.dirs))
+	for _, entry := range t.files {
+		entries = append(entries, entry)
+	}
+	for name, sub := range t.dirs {
+		hash, err := sub.write(repo)
+		if err != nil {
+			return plumbing.ZeroHash, err
+		}
+		entries = append(entries, object.TreeEntry{Name: name, Mode: filemode.Dir, Hash: hash})
+	}
+
+	// Git сортирует записи дерева так, будто к именам директорий добавлен "/"
+	slices.SortFunc(entries, func(a, b object.TreeEntry) int {
+		return cmp.Compare(treeSortName(a), treeSortName(b))
+	})
+
+	return storeObject(repo, &object.Tree{Entries: entries})
+}
+
+func treeSortName(entry object.TreeEntry) string {
+	if entry.Mode == filemode.Dir {
+		return entry.Name + "/"
+	}
+	return entry.Name
+}
+
+// storeObject кодирует объект (дерево или коммит) и сохраняет его в репозитории
+func storeObject(repo *git.Repository, obj interface {
+	Encode(plumbing.EncodedObject) error
+}) (plumbing.Hash, error) {
+	encoded := repo.Storer.NewEncodedObject()
+	if err := obj.Encode(encoded); err != nil {
+		return plumbing.ZeroHash, err
+	}
+	return repo.Storer.SetEncodedObject(encoded)
+}